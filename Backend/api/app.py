@@ -7,14 +7,18 @@ import time
 import pandas as pd
 from datetime import datetime
 import sys
-import threading
 import uuid
+import subprocess
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from scraper.shopify_scraper import ShopifyScraper
-from scraper.utils import setup_logging, validate_url, calculate_completeness
+from scraper.shopify_detector import ShopifyDetector
+from scraper.result_store import ResultReader, result_paths
+from scraper.utils import setup_logging, validate_url
+from api.session_store import get_session_store
+from api.worker import default_store_url
 
 app = Flask(__name__)
 CORS(app)
@@ -30,8 +34,18 @@ os.makedirs(OUT_DIR, exist_ok=True)
 setup_logging(os.path.join(LOG_DIR, "api.log"))
 logger = logging.getLogger(__name__)
 
-# Store active scraping sessions
-active_sessions = {}
+# Scraping sessions are shared between API workers and the scrape worker
+SESSION_STORE_URL = default_store_url()
+session_store = get_session_store(SESSION_STORE_URL)
+
+# Shared connection pool and TTL cache for Shopify detection
+shopify_detector = ShopifyDetector()
+
+# Maximum URLs accepted by /api/validate-urls
+MAX_BATCH_URLS = 1000
+
+# Seconds /api/validate-urls waits for probes; stays under gunicorn's 30 s worker timeout
+BATCH_DEADLINE = 20
 
 
 @app.route("/", methods=["GET"])
@@ -44,61 +58,10 @@ def health_check():
     return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
 
 
-def run_scraping_job(session_id, url, max_products, rate_limit):
-    """
-    Background scraping job
-    """
-    try:
-        logger.info(f"[{session_id}] Scraping started for {url}")
-
-        progress_data = active_sessions[session_id]
-        scraper = ShopifyScraper(url, rate_limit=rate_limit)
-
-        def progress_callback(count, product):
-            progress_data["total"] = count
-            progress_data["latest_product"] = product
-            progress_data["products"].append(product)
-
-        products = scraper.scrape_products(
-            max_products=max_products,
-            progress_callback=progress_callback
-        )
-
-        progress_data["status"] = "completed"
-        progress_data["products"] = products
-        progress_data["end_time"] = time.time()
-
-        # Metrics
-        elapsed_time = progress_data["end_time"] - progress_data["start_time"]
-        products_per_minute = (len(products) / elapsed_time) * 60 if elapsed_time > 0 else 0
-        completeness = calculate_completeness(products)
-
-        progress_data["metrics"] = {
-            "elapsed_time_seconds": round(elapsed_time, 2),
-            "products_per_minute": round(products_per_minute, 2),
-            "data_completeness": completeness["overall"],
-            "field_completeness": completeness["fields"],
-        }
-
-        # Save output json
-        output_file = os.path.join(OUT_DIR, f"scraped_data_{session_id}.json")
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(products, f, indent=2, ensure_ascii=False)
-
-        progress_data["output_file"] = output_file
-        logger.info(f"[{session_id}] Scraping completed. Total products: {len(products)}")
-
-    except Exception as e:
-        logger.error(f"[{session_id}] Scraping failed: {e}")
-        active_sessions[session_id]["status"] = "failed"
-        active_sessions[session_id]["errors"].append(str(e))
-        active_sessions[session_id]["end_time"] = time.time()
-
-
 @app.route("/api/scrape", methods=["POST"])
 def scrape():
     """
-    Start scrape in background thread (non-blocking)
+    Queue a scrape for the scrape worker (non-blocking)
     """
     try:
         data = request.json or {}
@@ -106,6 +69,17 @@ def scrape():
         max_products = int(data.get("max_products", 100))
         rate_limit = float(data.get("rate_limit", 1000)) / 1000  # ms -> sec
 
+        # Bounds for the adaptive controller (ms -> sec); without them the
+        # user's rate_limit is the floor and requests go one at a time
+        scraper_options = {
+            "rate_limit": rate_limit,
+            "min_rate_limit": float(data.get("min_rate_limit", rate_limit * 1000)) / 1000,
+            "max_rate_limit": max(float(data.get("max_rate_limit", 10000)) / 1000, rate_limit),
+            "max_concurrency": max(int(data.get("max_concurrency", 1)), 1),
+        }
+        if data.get("latency_target") is not None:
+            scraper_options["latency_target"] = float(data["latency_target"]) / 1000
+
         # Validate URL
         if not url or not validate_url(url):
             return jsonify({"error": "Invalid URL provided"}), 400
@@ -113,32 +87,32 @@ def scrape():
         session_id = str(uuid.uuid4())
 
         # Create session object
-        active_sessions[session_id] = {
+        session_store.create(session_id, {
             "session_id": session_id,
             "url": url,
             "total": 0,
-            "products": [],
             "latest_product": None,
-            "status": "running",
-            "start_time": time.time(),
+            "status": "queued",
+            "job": {
+                "url": url,
+                "max_products": max_products,
+                "scraper_options": scraper_options,
+            },
+            "start_time": time.time(),  # queued at
+            "started_at": None,  # claimed by the scrape worker
+            "heartbeat": None,
             "end_time": None,
             "metrics": None,
+            "controller": None,
+            "result_path": None,
             "output_file": None,
             "errors": [],
-        }
-
-        # Start thread
-        t = threading.Thread(
-            target=run_scraping_job,
-            args=(session_id, url, max_products, rate_limit),
-            daemon=True
-        )
-        t.start()
+        })
 
         return jsonify({
             "session_id": session_id,
-            "status": "running",
-            "message": "Scraping started in background"
+            "status": "queued",
+            "message": "Scraping queued in background"
         })
 
     except Exception as e:
@@ -151,11 +125,16 @@ def get_progress(session_id):
     """
     Return live progress
     """
-    if session_id not in active_sessions:
+    session_data = session_store.get(session_id)
+    if session_data is None:
         return jsonify({"error": "Session not found"}), 404
 
-    session_data = active_sessions[session_id]
-    elapsed = time.time() - session_data["start_time"]
+    # Throughput is measured from when the worker picked the session up
+    started_at = session_data.get("started_at")
+    if started_at:
+        elapsed = (session_data["end_time"] or time.time()) - started_at
+    else:
+        elapsed = 0
     products_per_minute = (session_data["total"] / elapsed) * 60 if elapsed > 0 else 0
 
     return jsonify({
@@ -168,41 +147,115 @@ def get_progress(session_id):
         "latest_product": session_data["latest_product"],
         "errors": session_data["errors"],
         "metrics": session_data["metrics"],
+        "controller": session_data["controller"],
         "output_file": session_data["output_file"]
     })
 
 
+def _completed_session(session_id):
+    """
+    Look up a completed session; returns (session_data, error_response)
+    """
+    session_data = session_store.get(session_id)
+    if session_data is None:
+        return None, (jsonify({"error": "Session not found"}), 404)
+
+    if session_data["status"] != "completed":
+        return None, (jsonify({"error": "Scraping not completed yet", "status": session_data["status"]}), 400)
+
+    return session_data, None
+
+
+def _open_results(session_data):
+    """
+    Open a completed session's result store; returns (reader, error_response)
+    """
+    result_path = session_data.get("result_path")
+    if not result_path:
+        return None, (jsonify({"error": "Results not available for this session"}), 404)
+
+    if not all(os.path.exists(path) for path in result_paths(result_path).values()):
+        return None, (jsonify({"error": "Results have been removed"}), 410)
+
+    return ResultReader(result_path), None
+
+
 @app.route("/api/results/<session_id>", methods=["GET"])
 def get_results(session_id):
     """
     Return final scraped products after completion
+    (optionally a page via ?offset=&limit=)
     """
-    if session_id not in active_sessions:
-        return jsonify({"error": "Session not found"}), 404
+    session_data, error = _completed_session(session_id)
+    if error:
+        return error
 
-    session_data = active_sessions[session_id]
+    offset = request.args.get("offset", 0, type=int)
+    limit = request.args.get("limit", None, type=int)
 
-    if session_data["status"] != "completed":
-        return jsonify({"error": "Scraping not completed yet", "status": session_data["status"]}), 400
+    reader, error = _open_results(session_data)
+    if error:
+        return error
+
+    with reader:
+        total = len(reader)
+        products = reader.slice(offset, limit)
 
     return jsonify({
         "session_id": session_id,
-        "total_products": len(session_data["products"]),
-        "products": session_data["products"],
+        "total_products": total,
+        "offset": offset,
+        "products": products,
         "metrics": session_data["metrics"]
     })
 
 
+@app.route("/api/results/<session_id>/products/<key>", methods=["GET"])
+def get_result_product(session_id, key):
+    """
+    Return a single scraped product by product_id or handle
+    """
+    session_data, error = _completed_session(session_id)
+    if error:
+        return error
+
+    reader, error = _open_results(session_data)
+    if error:
+        return error
+
+    with reader:
+        product = reader.find(key)
+
+    if product is None:
+        return jsonify({"error": "Product not found"}), 404
+
+    return jsonify(product)
+
+
 @app.route("/api/export", methods=["POST"])
 def export_data():
     """
     Export scraped products in json/csv/excel
+    (products in the body, or a slice of a completed session's results)
     """
     try:
         data = request.json or {}
         products = data.get("products", [])
         format_type = data.get("format", "json")
 
+        if not products and data.get("session_id"):
+            session_data, error = _completed_session(data["session_id"])
+            if error:
+                return error
+
+            limit = data.get("limit")
+            reader, error = _open_results(session_data)
+            if error:
+                return error
+
+            with reader:
+                products = reader.slice(int(data.get("offset", 0)), int(limit) if limit is not None else None)
+
         if not products:
             return jsonify({"error": "No products provided"}), 400
 
@@ -249,12 +302,7 @@ def validate_url_endpoint():
             return jsonify({"valid": False, "error": "Invalid URL format"}), 400
 
         # shopify check
-        try:
-            import requests
-            response = requests.get(f"{url}/products.json?limit=1", timeout=10)
-            is_shopify = response.status_code == 200 and "products" in response.json()
-        except:
-            is_shopify = False
+        is_shopify = shopify_detector.detect(url)
 
         return jsonify({
             "valid": True,
@@ -266,6 +314,62 @@ def validate_url_endpoint():
         return jsonify({"valid": False, "error": str(e)}), 500
 
 
+@app.route("/api/validate-urls", methods=["POST"])
+def validate_urls_endpoint():
+    """
+    Validate many URLs at once + concurrent shopify check
+    """
+    try:
+        data = request.json or {}
+        urls = data.get("urls")
+
+        if not isinstance(urls, list) or not urls:
+            return jsonify({"error": "No URLs provided"}), 400
+
+        if len(urls) > MAX_BATCH_URLS:
+            return jsonify({"error": f"Too many URLs (max {MAX_BATCH_URLS})"}), 400
+
+        unique_urls = dict.fromkeys(u for u in urls if isinstance(u, str))
+        valid_urls = [u for u in unique_urls if validate_url(u)]
+        detected, unfinished = shopify_detector.detect_many(valid_urls, deadline=BATCH_DEADLINE)
+        unfinished = set(unfinished)
+
+        results = []
+        for url in urls:
+            if isinstance(url, str) and url in unfinished:
+                results.append({"url": url, "valid": True, "is_shopify": None, "error": "Timed out, retry later"})
+                continue
+
+            if not isinstance(url, str) or url not in detected:
+                results.append({"url": url, "valid": False, "error": "Invalid URL format"})
+                continue
+
+            is_shopify = detected[url]
+            results.append({
+                "url": url,
+                "valid": True,
+                "is_shopify": is_shopify,
+                "message": "URL valid" + (" (Shopify detected)" if is_shopify else "")
+            })
+
+        return jsonify({
+            "total": len(results),
+            "shopify_count": sum(1 for r in results if r.get("is_shopify")),
+            "timed_out": len(unfinished),
+            "results": results
+        })
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port)
+    # Development server: run the scrape worker alongside it, as its own
+    # program so its processes do not re-import this module
+    worker = subprocess.Popen([sys.executable, "-m", "api.worker"], cwd=BASE_DIR)
+    try:
+        port = int(os.environ.get("PORT", 5000))
+        app.run(host="0.0.0.0", port=port)
+    finally:
+        worker.terminate()
+        worker.wait()
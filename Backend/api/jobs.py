@@ -0,0 +1,108 @@
+import logging
+import os
+import threading
+import time
+
+from scraper.shopify_scraper import ShopifyScraper
+from scraper.result_store import ResultWriter
+from scraper.utils import calculate_completeness
+from api.session_store import get_session_store
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between progress writes to the session store
+PROGRESS_INTERVAL = 0.5
+
+# Seconds between heartbeats of a running job
+HEARTBEAT_INTERVAL = 10
+
+
+def _heartbeat(store, session_id, stop_event):
+    """Keep the session's heartbeat fresh while its job is running"""
+    while not stop_event.wait(HEARTBEAT_INTERVAL):
+        try:
+            store.update(session_id, heartbeat=time.time())
+        except Exception as e:
+            logger.warning(f"[{session_id}] Heartbeat failed: {e}")
+
+
+def run_scraping_job(store_url, session_id, out_dir):
+    """
+    Background scraping job, executed in a scrape worker process
+    """
+    store = get_session_store(store_url)
+    stop_heartbeat = threading.Event()
+    threading.Thread(
+        target=_heartbeat, args=(store, session_id, stop_heartbeat), daemon=True
+    ).start()
+
+    try:
+        session_data = store.get(session_id)
+        job = session_data["job"]
+        url = job["url"]
+        logger.info(f"[{session_id}] Scraping started for {url}")
+
+        scraper = ShopifyScraper(url, **job["scraper_options"])
+        result_path = os.path.join(out_dir, f"scraped_data_{session_id}")
+        last_write = 0.0
+
+        # Products are persisted as they arrive, not dumped at the end
+        with ResultWriter(result_path) as writer:
+            def progress_callback(count, product):
+                nonlocal last_write
+                writer.write(product)
+                now = time.time()
+                if now - last_write >= PROGRESS_INTERVAL:
+                    store.update(
+                        session_id,
+                        total=count,
+                        latest_product=product,
+                        controller=scraper.controller.metrics(),
+                    )
+                    last_write = now
+
+            products = scraper.scrape_products(
+                max_products=job["max_products"],
+                progress_callback=progress_callback
+            )
+
+        end_time = time.time()
+
+        # Metrics
+        elapsed_time = end_time - session_data["started_at"]
+        products_per_minute = (len(products) / elapsed_time) * 60 if elapsed_time > 0 else 0
+        completeness = calculate_completeness(products)
+
+        metrics = {
+            "elapsed_time_seconds": round(elapsed_time, 2),
+            "products_per_minute": round(products_per_minute, 2),
+            "data_completeness": completeness["overall"],
+            "field_completeness": completeness["fields"],
+            "controller": scraper.controller.metrics(),
+        }
+
+        # A session already failed as stale stays failed
+        completed = store.transition(
+            session_id,
+            "running",
+            status="completed",
+            total=len(products),
+            latest_product=products[-1] if products else None,
+            end_time=end_time,
+            metrics=metrics,
+            controller=metrics["controller"],
+            result_path=result_path,
+            output_file=writer.paths["data"],
+        )
+        if not completed:
+            logger.warning(f"[{session_id}] Session is no longer running; not marking it completed")
+            return
+        logger.info(f"[{session_id}] Scraping completed. Total products: {len(products)}")
+
+    except Exception as e:
+        logger.error(f"[{session_id}] Scraping failed: {e}")
+        if store.transition(session_id, "running", status="failed", end_time=time.time()):
+            store.append_error(session_id, str(e))
+
+    finally:
+        stop_heartbeat.set()
@@ -0,0 +1,228 @@
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class SessionStore(ABC):
+    """
+    Shared storage for scraping session state and progress.
+
+    Every API worker and the scrape worker process talk to the same store, so
+    a progress poll can land on any worker. Sessions are plain JSON-serializable
+    dictionaries keyed by session_id; new sessions are created with status
+    "queued" and claimed by the scrape worker. A key/value store such as Redis
+    can implement this interface with GET/SET on a JSON blob per session and a
+    list of queued session ids.
+    """
+
+    @abstractmethod
+    def create(self, session_id: str, data: Dict) -> None:
+        """Store a new session"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict]:
+        """Return the session dictionary, or None if it does not exist"""
+
+    @abstractmethod
+    def update(self, session_id: str, **fields) -> None:
+        """Merge the given fields into an existing session"""
+
+    @abstractmethod
+    def transition(self, session_id: str, from_status: str, **fields) -> bool:
+        """
+        Merge fields into a session only if its status is still from_status
+
+        Returns:
+            True if the session was updated
+        """
+
+    @abstractmethod
+    def append_error(self, session_id: str, error: str) -> None:
+        """Append an error message to the session's error list"""
+
+    @abstractmethod
+    def claim_next(self, owner: str) -> Optional[Dict]:
+        """Atomically move the oldest queued session to running and return it"""
+
+    @abstractmethod
+    def list_by_status(self, status: str) -> List[Dict]:
+        """Return all sessions with the given status"""
+
+    @abstractmethod
+    def fail_stale(self, max_age: float) -> List[str]:
+        """
+        Mark running sessions whose heartbeat is older than max_age as failed
+
+        The status and heartbeat are re-checked atomically with the update, so
+        a session that completes concurrently is never overwritten.
+
+        Args:
+            max_age: Seconds without a heartbeat before a session is stale
+
+        Returns:
+            Ids of the sessions that were marked failed
+        """
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session store backed by a local SQLite file shared between processes"""
+
+    def __init__(self, db_path: str, timeout: float = 30.0):
+        """
+        Initialize the SQLite session store
+
+        Args:
+            db_path: Path of the SQLite database file
+            timeout: Seconds to wait for a lock held by another process
+        """
+        self.db_path = db_path
+        self.timeout = timeout
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, "
+                "data TEXT NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection; sqlite3 connections are not fork/thread safe"""
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def create(self, session_id: str, data: Dict) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, updated_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(data, ensure_ascii=False), time.time()),
+            )
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _modify(self, session_id: str, modifier) -> bool:
+        """
+        Read-modify-write a session inside a single write transaction
+
+        The modifier may return False to leave the session unchanged.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT data FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                if row is None:
+                    raise KeyError(session_id)
+
+                data = json.loads(row[0])
+                if modifier(data) is False:
+                    conn.execute("ROLLBACK")
+                    return False
+                conn.execute(
+                    "UPDATE sessions SET data = ?, updated_at = ? WHERE session_id = ?",
+                    (json.dumps(data, ensure_ascii=False), time.time(), session_id),
+                )
+                conn.execute("COMMIT")
+                return True
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def update(self, session_id: str, **fields) -> None:
+        self._modify(session_id, lambda data: data.update(fields))
+
+    def transition(self, session_id: str, from_status: str, **fields) -> bool:
+        def _transition(data):
+            if data.get("status") != from_status:
+                return False
+            data.update(fields)
+
+        return self._modify(session_id, _transition)
+
+    def append_error(self, session_id: str, error: str) -> None:
+        self._modify(session_id, lambda data: data.setdefault("errors", []).append(error))
+
+    def claim_next(self, owner: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT session_id, data FROM sessions "
+                    "WHERE json_extract(data, '$.status') = 'queued' "
+                    "ORDER BY json_extract(data, '$.start_time') LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                data = json.loads(row[1])
+                now = time.time()
+                data.update(status="running", owner=owner, started_at=now, heartbeat=now)
+                conn.execute(
+                    "UPDATE sessions SET data = ?, updated_at = ? WHERE session_id = ?",
+                    (json.dumps(data, ensure_ascii=False), time.time(), row[0]),
+                )
+                conn.execute("COMMIT")
+                return data
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def fail_stale(self, max_age: float) -> List[str]:
+        def _fail_if_stale(data):
+            now = time.time()
+            heartbeat = data.get("heartbeat") or data.get("started_at") or data["start_time"]
+            if data.get("status") != "running" or now - heartbeat <= max_age:
+                return False
+            data.update(status="failed", end_time=now)
+            data.setdefault("errors", []).append("Scrape worker stopped responding")
+
+        stale = []
+        for session in self.list_by_status("running"):
+            if self._modify(session["session_id"], _fail_if_stale):
+                stale.append(session["session_id"])
+        return stale
+
+    def list_by_status(self, status: str) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT data FROM sessions WHERE json_extract(data, '$.status') = ?", (status,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+def get_session_store(url: Optional[str] = None, default_path: str = "sessions.db") -> SessionStore:
+    """
+    Build a session store from a URL such as ``sqlite:///path/to/sessions.db``
+
+    Args:
+        url: Store URL (falls back to the SESSION_STORE_URL environment variable)
+        default_path: SQLite file used when no URL is configured
+
+    Returns:
+        SessionStore instance
+    """
+    url = url or os.environ.get("SESSION_STORE_URL")
+    if not url:
+        return SQLiteSessionStore(default_path)
+
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+
+    raise ValueError(f"Unsupported session store URL: {url}")
@@ -0,0 +1,120 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.utils import setup_logging
+from api.session_store import get_session_store
+from api.jobs import run_scraping_job
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOG_DIR = os.path.join(BASE_DIR, "logs")
+OUT_DIR = os.path.join(BASE_DIR, "output")
+
+# Seconds between polls for queued sessions
+POLL_INTERVAL = 1.0
+
+# Running sessions without a heartbeat for this long are marked failed
+STALE_AFTER = 60
+
+# Seconds between sweeps for stale running sessions
+STALE_CHECK_INTERVAL = 15
+
+
+def default_store_url() -> str:
+    """Session store shared by the API and the scrape worker"""
+    return os.environ.get(
+        "SESSION_STORE_URL", "sqlite:///" + os.path.join(OUT_DIR, "sessions.db")
+    )
+
+
+def run_worker(store_url: str, out_dir: str, log_file: str, max_workers: int = None):
+    """
+    Claim queued sessions from the store and scrape them in a process pool
+
+    Runs outside the web workers, so recycling a web worker never drops or
+    orphans a scrape. Exits after the running scrapes finish on SIGTERM/SIGINT.
+
+    Args:
+        store_url: Session store URL
+        out_dir: Directory for result files
+        log_file: Log file for the worker and its scrape processes
+        max_workers: Concurrent scrapes (defaults to SCRAPE_WORKERS or CPU count)
+    """
+    setup_logging(log_file)
+    os.makedirs(out_dir, exist_ok=True)
+
+    store = get_session_store(store_url)
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    max_workers = max_workers or int(os.environ.get("SCRAPE_WORKERS", os.cpu_count() or 1))
+    stopping = False
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    logger.info(f"Scrape worker {owner} started with {max_workers} processes")
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=setup_logging,
+        initargs=(log_file,),
+    ) as pool:
+        running = set()
+        last_stale_check = 0.0
+
+        while not stopping:
+            running = {f for f in running if not f.done()}
+
+            if time.time() - last_stale_check >= STALE_CHECK_INTERVAL:
+                for session_id in store.fail_stale(STALE_AFTER):
+                    logger.warning(f"[{session_id}] Marked failed: no heartbeat for {STALE_AFTER}s")
+                last_stale_check = time.time()
+
+            while len(running) < max_workers:
+                session = store.claim_next(owner)
+                if session is None:
+                    break
+                running.add(_submit(pool, store, store_url, session["session_id"], out_dir))
+
+            time.sleep(POLL_INTERVAL)
+
+    logger.info(f"Scrape worker {owner} stopped")
+
+
+def _submit(pool, store, store_url, session_id, out_dir):
+    """Run a claimed session on the pool, failing it if its process dies"""
+    future = pool.submit(run_scraping_job, store_url, session_id, out_dir)
+
+    def _on_done(f):
+        # A crashed process never reaches the job's own error handling
+        error = f.exception()
+        if error is not None:
+            logger.error(f"[{session_id}] Scrape process failed: {error}")
+            if store.transition(session_id, "running", status="failed", end_time=time.time()):
+                store.append_error(session_id, str(error))
+
+    future.add_done_callback(_on_done)
+    return future
+
+
+def main():
+    os.makedirs(LOG_DIR, exist_ok=True)
+    run_worker(default_store_url(), OUT_DIR, os.path.join(LOG_DIR, "worker.log"))
+
+
+if __name__ == "__main__":
+    main()
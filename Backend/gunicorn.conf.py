@@ -0,0 +1,31 @@
+"""
+Gunicorn configuration: serve the API and run the scrape worker next to it
+
+The scrape worker is started by the gunicorn master, not by the web workers,
+so recycling or killing a web worker never drops or orphans a scrape.
+"""
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+
+_scrape_worker = None
+
+
+def on_starting(server):
+    global _scrape_worker
+    if os.environ.get("SCRAPE_WORKER_EMBEDDED", "1") == "1":
+        _scrape_worker = subprocess.Popen([sys.executable, "-m", "api.worker"], cwd=BASE_DIR)
+
+
+def on_exit(server):
+    if _scrape_worker is not None:
+        _scrape_worker.terminate()
+        try:
+            _scrape_worker.wait(timeout=server.cfg.graceful_timeout)
+        except subprocess.TimeoutExpired:
+            _scrape_worker.kill()
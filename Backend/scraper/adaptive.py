@@ -0,0 +1,186 @@
+import time
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+# Number of recent adjustments kept for session metrics
+DECISION_HISTORY = 50
+
+# Statuses that mean the store is throttling or blocking us (430 is Shopify's bot block)
+THROTTLE_STATUSES = (403, 429, 430)
+
+# Smoothing factor for the latency EWMA
+LATENCY_ALPHA = 0.2
+
+
+class AdaptiveController:
+    """
+    AIMD controller for the in-flight request window and inter-request delay
+
+    Successful, fast responses additively grow the window and shrink the delay;
+    throttling (403/429/430), other 4xx, server errors, failures and slow
+    responses multiplicatively shrink the window and grow the delay, at most
+    once per window of requests. "Slow" is relative to the store's own
+    baseline (the fastest successful response seen), so a store that is
+    always slow is not mistaken for a congested one. Retry-After pauses all requests. Both values stay
+    within the bounds chosen by the user.
+    """
+
+    def __init__(
+        self,
+        delay: float = 1.0,
+        min_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        max_window: int = 1,
+        slowdown_factor: float = 3.0,
+        latency_target: Optional[float] = None,
+        delay_step: float = 0.05,
+    ):
+        """
+        Initialize the controller
+
+        Args:
+            delay: Initial delay between requests in seconds
+            min_delay: Lowest delay the controller may use (defaults to delay)
+            max_delay: Highest delay the controller may use (defaults to delay)
+            max_window: Maximum number of requests in flight
+            slowdown_factor: Responses slower than this multiple of the baseline
+                latency count as congestion
+            latency_target: Optional absolute latency in seconds; responses
+                slower than this also count as congestion
+            delay_step: Seconds removed from the delay after a window of successes
+        """
+        self.min_delay = delay if min_delay is None else min_delay
+        self.max_delay = delay if max_delay is None else max_delay
+        self.delay = min(max(delay, self.min_delay), self.max_delay)
+        self.max_window = max(1, max_window)
+        self.window = 1.0
+        self.slowdown_factor = slowdown_factor
+        self.latency_target = latency_target
+        self.delay_step = delay_step
+
+        self.latency = None  # EWMA of response latency in seconds
+        self.baseline_latency = None  # fastest successful response in seconds
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.decisions = deque(maxlen=DECISION_HISTORY)
+
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._last_request = 0.0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests allowed in flight right now"""
+        return int(self.window)
+
+    @property
+    def timeout(self) -> float:
+        """Request timeout derived from observed latency"""
+        if self.latency is None:
+            return 30.0
+        return min(max(self.latency * 4, 10.0), 60.0)
+
+    def wait(self):
+        """Wait until the next request may start (respects delay and Retry-After)"""
+        with self._lock:
+            now = time.time()
+            start = max(now, self._last_request + self.delay, self._paused_until)
+            self._last_request = start
+
+        if start > now:
+            time.sleep(start - now)
+
+    def record(self, latency: float, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        """
+        Feed back the outcome of a request
+
+        Args:
+            latency: Seconds the request took
+            status_code: HTTP status code, or None if the request failed
+            retry_after: Seconds from a Retry-After header, if present
+        """
+        with self._lock:
+            self.requests += 1
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency = (1 - LATENCY_ALPHA) * self.latency + LATENCY_ALPHA * latency
+
+            if status_code in THROTTLE_STATUSES:
+                self.throttled += 1
+                if retry_after:
+                    self._paused_until = max(self._paused_until, time.time() + retry_after)
+                self._decrease("throttled", latency, status_code=status_code, retry_after=retry_after)
+            elif status_code is None or status_code >= 400:
+                self.errors += 1
+                self._decrease("error", latency, status_code=status_code)
+            else:
+                if self.baseline_latency is None or latency < self.baseline_latency:
+                    self.baseline_latency = latency
+                if self._is_slow(latency):
+                    self._decrease("slow", latency, observed_latency=round(latency, 3))
+                else:
+                    self._increase()
+
+    def _is_slow(self, latency: float) -> bool:
+        """A response is slow if both it and the EWMA exceed the congestion threshold"""
+        threshold = self.slowdown_factor * self.baseline_latency
+        if self.latency_target is not None:
+            threshold = min(threshold, self.latency_target)
+        return latency > threshold and self.latency > threshold
+
+    def _increase(self):
+        """Additive increase, once per window's worth of successes"""
+        self._successes += 1
+        if self._successes < self.in_flight:
+            return
+        self._successes = 0
+
+        window = min(self.window + 1, self.max_window)
+        delay = max(self.delay - self.delay_step, self.min_delay)
+        if window != self.window or delay != self.delay:
+            self.window, self.delay = window, delay
+            self._log("increase")
+
+    def _decrease(self, reason: str, latency: float, **details):
+        """Multiplicative decrease, once per congestion event"""
+        # Requests already in flight at the last decrease report the same event
+        if time.time() - latency < self._last_decrease:
+            return
+        self._last_decrease = time.time()
+
+        self._successes = 0
+        self.window = max(self.window / 2, 1.0)
+        self.delay = min(max(self.delay * 2, self.delay_step), self.max_delay)
+        self.delay = max(self.delay, self.min_delay)
+        self._log(reason, **details)
+
+    def _log(self, reason: str, **details):
+        self.decisions.append({
+            "time": round(time.time(), 3),
+            "reason": reason,
+            "window": self.in_flight,
+            "delay": round(self.delay, 3),
+            **details,
+        })
+
+    def metrics(self) -> Dict:
+        """Current controller state and recent decisions"""
+        with self._lock:
+            return {
+                "window": self.in_flight,
+                "delay_seconds": round(self.delay, 3),
+                "timeout_seconds": round(self.timeout, 2),
+                "avg_latency_seconds": round(self.latency, 3) if self.latency is not None else None,
+                "baseline_latency_seconds": (
+                    round(self.baseline_latency, 3) if self.baseline_latency is not None else None
+                ),
+                "requests": self.requests,
+                "errors": self.errors,
+                "throttled": self.throttled,
+                "decisions": list(self.decisions),
+            }
@@ -3,6 +3,7 @@ E-commerce Scraper Package
 """
 from .shopify_scraper import ShopifyScraper
 from .data_extractor import DataExtractor
+from .shopify_detector import ShopifyDetector
 from .utils import setup_logging, validate_url
 
-__all__ = ['ShopifyScraper', 'DataExtractor', 'setup_logging', 'validate_url']
\ No newline at end of file
+__all__ = ['ShopifyScraper', 'DataExtractor', 'ShopifyDetector', 'setup_logging', 'validate_url']
\ No newline at end of file
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional
+
+# Each index entry is the little-endian uint64 byte offset of one record
+OFFSET_FORMAT = "<Q"
+OFFSET_SIZE = struct.calcsize(OFFSET_FORMAT)
+
+# Each key index entry is (uint64 key hash, uint64 record position), sorted by hash
+KEY_FORMAT = "<QQ"
+KEY_SIZE = struct.calcsize(KEY_FORMAT)
+
+
+def key_hash(key) -> int:
+    """Stable 64-bit hash of a product_id or handle (same in every process)"""
+    digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def result_paths(base_path: str) -> Dict[str, str]:
+    """Return the data, offset index and key index file paths for a result store"""
+    return {
+        "data": f"{base_path}.ndjson",
+        "index": f"{base_path}.idx",
+        "keys": f"{base_path}.keys",
+    }
+
+
+class ResultWriter:
+    """
+    Append-only product store written while scraping
+
+    Products are stored one JSON document per line (NDJSON). A fixed-width
+    offset index allows jumping straight to record N, and a sorted table of
+    key hashes maps product_id and handle to the record number.
+    """
+
+    def __init__(self, base_path: str):
+        """
+        Initialize the result writer
+
+        Args:
+            base_path: Path prefix for the data and index files
+        """
+        self.paths = result_paths(base_path)
+        self._data = open(self.paths["data"], "wb")
+        self._index = open(self.paths["index"], "wb")
+        self._keys = []
+        self.count = 0
+
+    def write(self, product: Dict) -> None:
+        """Append a product record"""
+        offset = self._data.tell()
+        self._data.write(json.dumps(product, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._index.write(struct.pack(OFFSET_FORMAT, offset))
+
+        for key in {str(k) for k in (product.get("product_id"), product.get("handle")) if k is not None}:
+            self._keys.append((key_hash(key), self.count))
+        self.count += 1
+
+    def close(self) -> None:
+        """Flush records and write the key index"""
+        self._data.close()
+        self._index.close()
+        with open(self.paths["keys"], "wb") as f:
+            for entry in sorted(self._keys):
+                f.write(struct.pack(KEY_FORMAT, *entry))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ResultReader:
+    """Random-access reader for a result store, backed by mmap"""
+
+    def __init__(self, base_path: str):
+        """
+        Open a result store for reading
+
+        Args:
+            base_path: Path prefix used when the store was written
+        """
+        self.paths = result_paths(base_path)
+        self._data = self._map(self.paths["data"])
+        self._index = self._map(self.paths["index"])
+        self._keys = self._map(self.paths["keys"])
+
+    @staticmethod
+    def _map(path: str) -> Optional[mmap.mmap]:
+        """Memory-map a file read-only; empty files cannot be mapped"""
+        if os.path.getsize(path) == 0:
+            return None
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self._index) // OFFSET_SIZE if self._index else 0
+
+    def _offset(self, position: int) -> int:
+        return struct.unpack_from(OFFSET_FORMAT, self._index, position * OFFSET_SIZE)[0]
+
+    def get(self, position: int) -> Dict:
+        """Return the record at the given position"""
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+
+        start = self._offset(position)
+        end = self._data.find(b"\n", start)
+        return json.loads(self._data[start:end])
+
+    def slice(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Return a page of records
+
+        Args:
+            offset: Position of the first record
+            limit: Maximum number of records (None for all remaining)
+
+        Returns:
+            List of product dictionaries
+        """
+        total = len(self)
+        start = max(offset, 0)
+        stop = total if limit is None else min(start + max(limit, 0), total)
+        if start >= stop:
+            return []
+
+        # Records are contiguous, so a page is a single read
+        begin = self._offset(start)
+        end = self._offset(stop) if stop < total else len(self._data)
+        return [json.loads(line) for line in self._data[begin:end].splitlines()]
+
+    def find(self, key) -> Optional[Dict]:
+        """Return the product with the given product_id or handle, if any"""
+        if self._keys is None:
+            return None
+
+        # Binary search for the first entry with this hash
+        target = key_hash(key)
+        low, high = 0, len(self._keys) // KEY_SIZE
+        while low < high:
+            mid = (low + high) // 2
+            if struct.unpack_from(KEY_FORMAT, self._keys, mid * KEY_SIZE)[0] < target:
+                low = mid + 1
+            else:
+                high = mid
+
+        # Entries sharing the hash are checked against the record itself
+        key = str(key)
+        while low * KEY_SIZE < len(self._keys):
+            entry_hash, position = struct.unpack_from(KEY_FORMAT, self._keys, low * KEY_SIZE)
+            if entry_hash != target:
+                break
+            product = self.get(position)
+            if key in (str(product.get("product_id")), str(product.get("handle"))):
+                return product
+            low += 1
+        return None
+
+    def close(self) -> None:
+        for mapped in (self._data, self._index, self._keys):
+            if mapped is not None:
+                mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
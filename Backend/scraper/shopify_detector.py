@@ -0,0 +1,124 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .utils import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Response headers Shopify sets on storefront responses
+SHOPIFY_HEADERS = ("x-shopid", "x-shopify-stage", "x-shardid", "x-storefront-renderer-rendered")
+
+# Bytes to read from products.json when headers are inconclusive
+SNIFF_BYTES = 512
+
+# Seconds to remember an inconclusive probe (network error, 429, 5xx)
+FAILURE_TTL = 60
+
+
+class ShopifyDetector:
+    """Detect Shopify stores concurrently over pooled connections, with cached results"""
+
+    def __init__(self, timeout: float = 5.0, max_workers: int = 32, cache_ttl: float = 3600):
+        """
+        Initialize the Shopify detector
+
+        Args:
+            timeout: Connect/read timeout per probe in seconds
+            max_workers: Maximum concurrent probes
+            cache_ttl: Seconds to keep a detection result
+        """
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.cache = TTLCache(cache_ttl)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(
+            {
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+                "Accept": "application/json",
+            }
+        )
+
+    def detect(self, url: str) -> bool:
+        """
+        Check whether a URL is a Shopify store, using the cache when possible
+
+        Args:
+            url: Store base URL
+
+        Returns:
+            True if Shopify was detected
+        """
+        url = url.rstrip("/")
+        cached = self.cache.get(url)
+        if cached is not None:
+            return cached
+
+        is_shopify, definite = self._probe(url)
+        # Inconclusive probes are retried soon rather than cached for the full TTL
+        self.cache.set(url, is_shopify, ttl=None if definite else FAILURE_TTL)
+        return is_shopify
+
+    def detect_many(self, urls: List[str], deadline: Optional[float] = None) -> Tuple[Dict[str, bool], List[str]]:
+        """
+        Check many URLs concurrently
+
+        Args:
+            urls: Store base URLs
+            deadline: Seconds to wait for the whole batch (None waits for all)
+
+        Returns:
+            Tuple of (dictionary mapping each finished URL to its detection
+            result, list of URLs that did not finish before the deadline)
+        """
+        if not urls:
+            return {}, []
+
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls)))
+        futures = {url: pool.submit(self.detect, url) for url in urls}
+        wait(list(futures.values()), timeout=deadline)
+        # Probes still running finish in the background and fill the cache
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        results, unfinished = {}, []
+        for url, future in futures.items():
+            if future.done() and not future.cancelled():
+                results[url] = future.result()
+            else:
+                unfinished.append(url)
+        return results, unfinished
+
+    def _probe(self, url: str) -> Tuple[bool, bool]:
+        """
+        Probe products.json, reading headers and at most SNIFF_BYTES of the body
+
+        Returns:
+            Tuple of (is_shopify, definite); definite is False when the store
+            could not give a real answer (network error, 429, 5xx)
+        """
+        try:
+            with self.session.get(
+                f"{url}/products.json?limit=1", timeout=self.timeout, stream=True
+            ) as response:
+                headers = {k.lower() for k in response.headers}
+                if any(h in headers for h in SHOPIFY_HEADERS):
+                    return True, True
+                if "shopify" in response.headers.get("powered-by", "").lower():
+                    return True, True
+
+                if response.status_code == 429 or response.status_code >= 500:
+                    return False, False
+                if response.status_code != 200:
+                    return False, True
+
+                head = next(response.iter_content(chunk_size=SNIFF_BYTES), b"")
+                return b'"products"' in head[:SNIFF_BYTES], True
+        except requests.RequestException as e:
+            logger.debug(f"Shopify probe failed for {url}: {e}")
+            return False, False
@@ -1,30 +1,60 @@
 import requests
 import time
+import heapq
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from email.utils import parsedate_to_datetime
 from typing import List, Dict, Optional
 from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from .data_extractor import DataExtractor
-from .utils import validate_url, RateLimiter
+from .adaptive import AdaptiveController
+from .utils import validate_url
 
 logger = logging.getLogger(__name__)
 
+# Attempts per page before the scrape stops at that page
+MAX_PAGE_ATTEMPTS = 4
+
 
 class ShopifyScraper:
     """Scraper specifically designed for Shopify-based e-commerce stores"""
 
-    def __init__(self, base_url: str, rate_limit: float = 1.0):
+    def __init__(
+        self,
+        base_url: str,
+        rate_limit: float = 1.0,
+        min_rate_limit: Optional[float] = None,
+        max_rate_limit: Optional[float] = None,
+        max_concurrency: int = 1,
+        latency_target: Optional[float] = None,
+    ):
         """
         Initialize the Shopify scraper
 
         Args:
             base_url: Base URL of the Shopify store
-            rate_limit: Delay between requests in seconds
+            rate_limit: Initial delay between requests in seconds
+            min_rate_limit: Lowest delay the adaptive controller may use
+            max_rate_limit: Highest delay the adaptive controller may use
+            max_concurrency: Maximum page requests in flight
+            latency_target: Response time in seconds above which the controller
+                backs off (by default, slow is relative to the store's fastest response)
         """
         self.base_url = base_url.rstrip("/")
-        self.rate_limiter = RateLimiter(rate_limit)
+        self.controller = AdaptiveController(
+            delay=rate_limit,
+            min_delay=min_rate_limit,
+            max_delay=max_rate_limit,
+            max_window=max_concurrency,
+            latency_target=latency_target,
+        )
         self.extractor = DataExtractor()
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max(max_concurrency, 10))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.session.headers.update(
             {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
@@ -54,48 +84,79 @@ class ShopifyScraper:
         all_products = []
 
         try:
-            # Use Shopify's products.json API
-            page = 1
+            # Use Shopify's products.json API. The page size stays fixed because
+            # pagination is by page number; the controller adapts the window instead.
             limit = 250  # Shopify's max limit per page
+            stop_page = -(-max_products // limit) + 1 if max_products else None
+
+            in_flight = {}  # page -> future
+            attempts = {}  # page -> attempts so far
+            retry_pages = []  # pages waiting to be retried, lowest first
+            completed = {}  # page -> products, held until earlier pages arrive
+            next_page = 1
+            emit_page = 1
+
+            with ThreadPoolExecutor(max_workers=self.controller.max_window) as pool:
+                while True:
+                    # Retries and new pages share the controller's window
+                    retry_pages = [p for p in retry_pages if stop_page is None or p < stop_page]
+                    heapq.heapify(retry_pages)
+                    while len(in_flight) < self.controller.in_flight:
+                        if retry_pages:
+                            page = heapq.heappop(retry_pages)
+                            attempts[page] += 1
+                        elif stop_page is None or next_page < stop_page:
+                            page = next_page
+                            attempts[page] = 1
+                            next_page += 1
+                        else:
+                            break
+                        in_flight[page] = pool.submit(self._fetch_page, page, limit)
 
-            while True:
-                if max_products and len(all_products) >= max_products:
-                    break
-
-                self.rate_limiter.wait()
-
-                products_url = f"{self.base_url}/products.json?limit={limit}&page={page}"
-                logger.info(f"Fetching page {page}: {products_url}")
-
-                try:
-                    response = self.session.get(products_url, timeout=30)
-                    response.raise_for_status()
-
-                    data = response.json()
-                    products = data.get("products", [])
-
-                    if not products:
-                        logger.info("No more products found")
+                    if not in_flight:
                         break
 
-                    # Process each product
-                    for product in products:
-                        if max_products and len(all_products) >= max_products:
+                    done, _ = wait(list(in_flight.values()), return_when=FIRST_COMPLETED)
+                    for page in [p for p, f in in_flight.items() if f in done]:
+                        future = in_flight.pop(page)
+                        try:
+                            completed[page] = future.result()
+                        except requests.RequestException as e:
+                            if self._is_retryable(e) and attempts[page] < MAX_PAGE_ATTEMPTS:
+                                logger.warning(f"Error fetching page {page}: {e}. Retrying...")
+                                heapq.heappush(retry_pages, page)
+                            else:
+                                logger.error(f"Error fetching page {page}: {e}")
+                                stop_page = page if stop_page is None else min(stop_page, page)
+
+                    # Hand products to the caller in page order
+                    while emit_page in completed and (stop_page is None or emit_page < stop_page):
+                        products = completed.pop(emit_page)
+
+                        if not products:
+                            logger.info("No more products found")
+                            stop_page = emit_page
                             break
 
-                        processed_product = self._process_product(product)
-                        all_products.append(processed_product)
+                        # Process each product
+                        for product in products:
+                            if max_products and len(all_products) >= max_products:
+                                break
+
+                            processed_product = self._process_product(product)
+                            all_products.append(processed_product)
 
-                        # Call progress callback
-                        if progress_callback:
-                            progress_callback(len(all_products), processed_product)
+                            # Call progress callback
+                            if progress_callback:
+                                progress_callback(len(all_products), processed_product)
 
-                    logger.info(f"Scraped {len(products)} products from page {page}")
-                    page += 1
+                        logger.info(f"Scraped {len(products)} products from page {emit_page}")
+                        emit_page += 1
 
-                except requests.RequestException as e:
-                    logger.error(f"Error fetching page {page}: {e}")
-                    break
+                    if stop_page is not None:
+                        # Pages past the end are not needed
+                        for page in [p for p in in_flight if p >= stop_page]:
+                            in_flight.pop(page).cancel()
 
         except Exception as e:
             logger.error(f"Scraping failed: {e}")
@@ -104,6 +165,53 @@ class ShopifyScraper:
         logger.info(f"Scraping completed. Total products: {len(all_products)}")
         return all_products
 
+    def _fetch_page(self, page: int, limit: int) -> List[Dict]:
+        """Fetch one products.json page, reporting the outcome to the controller"""
+        self.controller.wait()
+
+        products_url = f"{self.base_url}/products.json?limit={limit}&page={page}"
+        logger.info(f"Fetching page {page}: {products_url}")
+
+        start = time.time()
+        try:
+            response = self.session.get(products_url, timeout=self.controller.timeout)
+        except requests.RequestException:
+            self.controller.record(time.time() - start)
+            raise
+
+        self.controller.record(
+            time.time() - start,
+            status_code=response.status_code,
+            retry_after=self._retry_after(response),
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        return data.get("products", [])
+
+    def _is_retryable(self, error: requests.RequestException) -> bool:
+        """Only throttling, server errors and connection problems can succeed later"""
+        if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return True
+        response = getattr(error, "response", None)
+        if isinstance(error, requests.HTTPError) and response is not None:
+            return response.status_code == 429 or response.status_code >= 500
+        return False
+
+    def _retry_after(self, response) -> Optional[float]:
+        """Parse a Retry-After header (seconds or HTTP date)"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
     # ✅ NEW FUNCTION ADDED
     def _normalize_tags(self, tags):
         """Normalize tags: supports list or comma-separated string"""
@@ -1,5 +1,6 @@
 import time
 import logging
+import threading
 import validators
 from typing import Optional
 from functools import wraps
@@ -40,6 +41,48 @@ class RateLimiter:
         self.last_request = time.time()
 
 
+class TTLCache:
+    """Thread-safe in-memory cache whose entries expire after a fixed time"""
+
+    def __init__(self, ttl: float = 3600, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value, or default if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if time.time() >= expires_at:
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        """Cache a value for ttl seconds (defaults to the cache's ttl)"""
+        with self._lock:
+            now = time.time()
+            self._data.pop(key, None)
+            if len(self._data) >= self.max_size:
+                self._purge(now)
+            self._data[key] = (value, now + (self.ttl if ttl is None else ttl))
+
+    def _purge(self, now: float):
+        """Drop expired entries, then the oldest ones if still full"""
+        for key in [k for k, (_, expires_at) in self._data.items() if now >= expires_at]:
+            del self._data[key]
+        while len(self._data) >= self.max_size:
+            del self._data[next(iter(self._data))]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
 def retry_on_failure(max_retries: int = 3, delay: float = 2.0):
     """Decorator to retry function on failure"""
     def decorator(func):
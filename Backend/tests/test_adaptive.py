@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.adaptive import AdaptiveController
+
+
+def test_slow_response_backs_off_without_error():
+    controller = AdaptiveController(delay=1.0, min_delay=0.1, max_delay=10.0, max_window=4, latency_target=5.0)
+    controller.record(0.5, 200)
+
+    controller.record(controller.latency_target + 1, 200)
+
+    assert controller.decisions[-1]["reason"] == "slow"
+    assert controller.decisions[-1]["observed_latency"] == 6.0
+
+
+def test_uniformly_slow_store_is_not_congested():
+    controller = AdaptiveController(delay=1.0, min_delay=0.5, max_delay=10.0, max_window=4)
+
+    for _ in range(10):
+        controller.record(7.0, 200)
+
+    assert all(d["reason"] == "increase" for d in controller.decisions)
+    assert controller.delay <= 1.0
+
+
+def test_slowdown_against_baseline_backs_off():
+    controller = AdaptiveController(delay=1.0, min_delay=0.5, max_delay=10.0, max_window=4)
+    for _ in range(5):
+        controller.record(0.2, 200)
+
+    for _ in range(5):
+        controller.record(2.0, 200)
+
+    assert any(d["reason"] == "slow" for d in controller.decisions)
+
+
+def test_client_errors_back_off():
+    controller = AdaptiveController(delay=1.0, min_delay=0.1, max_delay=10.0, max_window=4)
+
+    controller.record(0.1, 403)
+
+    assert controller.throttled == 1
+    assert controller.decisions[-1]["reason"] == "throttled"
+    assert controller.delay == 2.0